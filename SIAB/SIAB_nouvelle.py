@@ -11,7 +11,6 @@ Contains two functions:
    of the bands as reference, to reproduce the band structures of interest, for
    wannierize and kpoint extrapolation.
 """
-import argparse
 def initialize(command_line: bool = True):
     """initialize the whole workflow of orbital generation:
     1. specify input script
@@ -42,10 +41,12 @@ Tutorials: https://mcresearch.github.io/abacus-user-guide/abacus-nac1.html
 See reference for more information.
 ===================================================================================================
     """
-    print(welcome, flush = True)
     placeholder_1 = ""
     placeholder_2 = ""
     if command_line:
+        # only print the banner and parse arguments when really called from command line
+        import argparse
+        print(welcome, flush = True)
         parser = argparse.ArgumentParser(description=welcome)
         parser.add_argument(
             "-i", "--input", 
@@ -77,7 +78,6 @@ See reference for more information.
 
     return placeholder_1, placeholder_2, placeholder_3
 
-import SIAB.driver.front as sdf
 def run(fname: str, 
         siab_version: str = "0.1.0", 
         test: bool = True):
@@ -129,6 +129,8 @@ def run(fname: str,
     ```
     `general`: for other global parameters, will be refactored out in future versions.
     """
+    # the driver pulls in numpy, scipy and torch, import it only when really needed
+    import SIAB.driver.front as sdf
     # read input, for each term, see above annotation for details
     structures, calculation_settings,\
     siab_settings, env_settings, general = sdf.initialize(fname=fname, version=siab_version)
@@ -160,31 +162,30 @@ def run(fname: str,
                  siab_settings=siab_settings,
                  siab_version=siab_version)
 
-import SIAB.include.citation as sicite
 def finalize():
     """finalize the whole workflow of orbital generation:
     """
+    import SIAB.include.citation as sicite
     print(sicite.citation(), flush = True)
 
-import time
 def main(command_line: bool = True):
     """entry point of the whole workflow of orbital generation"""
-    t_start = time.time()
+    import time
+    t_start = time.perf_counter_ns()
     
     fname, test, version = initialize(command_line=command_line)
-    t_initialize = time.time()
+    t_initialize = time.perf_counter_ns()
     run(fname=fname, siab_version=version, test=test)
-    t_run = time.time()
+    t_run = time.perf_counter_ns()
     finalize()
-    t_finalize = time.time()
-    t_end = time.time()
+    t_finalize = time.perf_counter_ns()
     # print time statistics with format %.2f
     print(f"""TIME STATISTICS
 ---------------
-{"initialize":20s} {t_initialize - t_start:10.2f} s
-{"run":20s} {t_run - t_initialize:10.2f} s
-{"finalize":20s} {t_finalize - t_run:10.2f} s
-{"total":20s} {t_end - t_start:10.2f} s
+{"initialize":20s} {(t_initialize - t_start) / 1e9:10.2f} s
+{"run":20s} {(t_run - t_initialize) / 1e9:10.2f} s
+{"finalize":20s} {(t_finalize - t_run) / 1e9:10.2f} s
+{"total":20s} {(t_finalize - t_start) / 1e9:10.2f} s
 """, flush = True)
 
 if __name__ == '__main__':
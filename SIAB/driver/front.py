@@ -24,7 +24,7 @@ def initialize(version: str = "0.1.0",
     if not os.path.exists(fpseudo): # check the existence of pseudopotential file
         raise FileNotFoundError("Pseudopotential file %s not found"%fpseudo)
     
-    pseudopotential = sipa.extract_ppinfo_forsiab(fname=fpseudo)
+    pseudopotential = sipa.extract_many([fpseudo])[fpseudo]
     unpacked = siri.unpack_siab_input(user_settings, pseudopotential)
     return unpacked
 
@@ -627,6 +627,8 @@ the right direction which may because of low dissociation energy. Exit."""%ener_
 # DESCRIPTION: run ABACUS calculation on     #
 #              reference structures simply   #
 # -------------------------------------------#
+import functools
+from concurrent.futures import ThreadPoolExecutor
 def normal(general: dict,
            reference_shape: str,
            bond_lengths: list,
@@ -636,7 +638,7 @@ def normal(general: dict,
     """iteratively run ABACUS calculation on reference structures
     To let optimizer be easy to find output, return names of folders"""
 
-    folders = []
+    folders, jobs = [], []
     for bond_length in bond_lengths:
         stru_setting = {"element": general["element"], "shape": reference_shape, "bond_length": bond_length,
             "fpseudo": general["pseudo_name"], "lattice_constant": 20.0, "nspin": calculation_setting["nspin"],
@@ -654,13 +656,20 @@ def normal(general: dict,
         print("""Run ABACUS calculation on reference structure.
 Reference structure: %s
 Bond length: %s"""%(reference_shape, bond_length), flush=True)
-        # need a better design here
-        _jtg = sienv.submit(folder=folder,
-                            module_load_command=env_settings["environment"],
-                            mpi_command=env_settings["mpi_command"],
-                            program_command=env_settings["abacus_command"],
-                            test=test)
-        
+        jobs.append(folder)
+    # need a better design here
+    submit = functools.partial(sienv.submit,
+                               module_load_command=env_settings["environment"],
+                               mpi_command=env_settings["mpi_command"],
+                               program_command=env_settings["abacus_command"],
+                               test=test)
+    # jobs are independent with each other, can be run concurrently if allowed
+    max_parallel_jobs = env_settings.get("max_parallel_jobs", 1)
+    if max_parallel_jobs > 1 and len(jobs) > 1:
+        with ThreadPoolExecutor(max_workers=max_parallel_jobs) as executor:
+            _jtgs = list(executor.map(submit, jobs))
+    else:
+        _jtgs = [submit(folder) for folder in jobs]
     """wait for all jobs to finish"""
     return folders
 
@@ -24,11 +24,11 @@ def submit(folder: str = "",
     jtg += "echo \"run with command: $mpi_command $program_command\"\n"
     jtg += "stdbuf -oL $mpi_command $program_command"
 
-    os.chdir(folder)
     if not test:
         hpc_settings = {"shell": True, "text": True, "timeout": 72000}
-        run(command=jtg, env=env, hpc_settings=hpc_settings)
-    os.chdir("../")
+        """change directory only in the subshell, instead of os.chdir, so that jobs in
+        different folders can be submitted concurrently"""
+        run(command="cd %s\n%s"%(folder, jtg), env=env, hpc_settings=hpc_settings)
     return jtg
 
 ##############################################
@@ -1,11 +1,49 @@
 """a simple module for parsing main information from pseudopotential"""
 """With Python-xml parser, provide general parser for UPF format pseudopotential"""
+import os
+import functools
+import types
+
+def _cache_key(fname: str):
+    """the file is identified by its real path, together with modification time and size,
+    so that once the file is changed on disk, the cached result will be invalidated"""
+    fname = os.path.realpath(fname)
+    stat = os.stat(fname)
+    return fname, stat.st_mtime_ns, stat.st_size
 
 import SIAB.io.pseudopotential.components as sipc
-def parse(fname: str):
+def _parse_impl(fname: str):
     return sipc.parse(fname=fname)
 
+@functools.lru_cache(maxsize=32)
+def _parse_cached(fname: str, mtime_ns: int, size: int):
+    """mtime_ns and size only take part in the key of cache"""
+    return _parse_impl(fname)
+
+def parse(fname: str):
+    """parse the pseudopotential file, the result is cached for the same file. Do not
+    modify the returned dictionary in-place"""
+    return _parse_cached(*_cache_key(fname))
+
 import SIAB.io.pseudopotential.tools.advanced as sipta
+def _extract_ppinfo_impl(fname: str):
+    parsed = parse(fname=fname)
+    element, val_conf = sipta.val_conf(parsed=parsed)
+    z_val = sipta.z_val(parsed=parsed)
+    return {
+        "element": element,
+        "val_conf": val_conf,
+        "z_val": z_val
+    }
+
+# results extracted in other processes by extract_many, waiting to be put into cache
+_prefetched = {}
+@functools.lru_cache(maxsize=32)
+def _extract_ppinfo_cached(fname: str, mtime_ns: int, size: int):
+    """mtime_ns and size only take part in the key of cache"""
+    result = _prefetched.pop((fname, mtime_ns, size), None)
+    return types.MappingProxyType(result if result is not None else _extract_ppinfo_impl(fname))
+
 def extract_ppinfo_forsiab(fname: str):
     """towards SIAB generating numerical atomic orbitals, return a dictionary
     contains information like:
@@ -16,12 +54,27 @@ def extract_ppinfo_forsiab(fname: str):
             ["3s", "3p"],
             ["3d"]
         ],
-    }"""
-    parsed = parse(fname=fname)
-    element, val_conf = sipta.val_conf(parsed=parsed)
-    z_val = sipta.z_val(parsed=parsed)
-    return {
-        "element": element,
-        "val_conf": val_conf,
-        "z_val": z_val
-    }
\ No newline at end of file
+    }
+    the result is cached for the same file and returned as read-only mapping"""
+    return _extract_ppinfo_cached(*_cache_key(fname))
+
+from concurrent.futures import ProcessPoolExecutor
+def extract_many(fnames: list):
+    """extract information towards SIAB for a batch of pseudopotential files, return a
+    dictionary whose keys are the filenames. Parsing is done in parallel processes when
+    more than one distinct file is given, the results are cached in the same way as
+    extract_ppinfo_forsiab"""
+    keys = {fname: _cache_key(fname) for fname in dict.fromkeys(fnames)}
+    # different names of the same file (relative path, symlink...) are only parsed once
+    todo = list(dict.fromkeys(keys.values()))
+    if len(todo) > 1:
+        # MappingProxyType cannot be pickled, therefore workers return plain dict
+        with ProcessPoolExecutor(max_workers=min(len(todo), os.cpu_count() or 1)) as executor:
+            results = executor.map(_extract_ppinfo_impl, [key[0] for key in todo], chunksize=1)
+            _prefetched.update(zip(todo, results))
+    try:
+        return {fname: _extract_ppinfo_cached(*key) for fname, key in keys.items()}
+    finally:
+        # for files already in cache, the prefetched results are not consumed
+        for key in todo:
+            _prefetched.pop(key, None)
@@ -1,10 +1,9 @@
+import io
 import xml.etree.ElementTree as ET
-def iter_tree(root: ET.Element):
-    """iterate through the tree, return a dictionary flattened from the tree"""
-    return {child.tag: {"attrib": child.attrib, "data": child.text} for child in list(root.iter())}
 
 def preprocess(fname: str):
-    """ADC pseudopotential has & symbol at the beginning of line, which is not allowed in xml, replace & with &amp;"""
+    """ADC pseudopotential has & symbol at the beginning of line, which is not allowed in xml, replace & with &amp;
+    Return the processed text, the file itself is not modified"""
     with open(fname, "r") as f:
         lines = f.readlines()
     """GBRV pseudopotential does not startswith <UPF version="2.0.1">, but <PP_INFO>, 
@@ -13,34 +12,49 @@ def preprocess(fname: str):
         lines.insert(0, "<UPF version=\"2.0.1\">\n")
         lines.append("</UPF>")
 
-    with open(fname, "w") as f:
-        for line in lines:
-            """if line starts with &, replace & with &amp;, 
-            but if already &amp;, do not replace"""
-            if line.strip().startswith("&") and not line.strip().startswith("&amp;"):
-                line = line.replace("&", "&amp;")
-            
-            f.write(line)
+    processed = []
+    for line in lines:
+        """if line starts with &, replace & with &amp;, 
+        but if already &amp;, do not replace"""
+        if line.strip().startswith("&") and not line.strip().startswith("&amp;"):
+            line = line.replace("&", "&amp;")
+        
+        processed.append(line)
 
-            if line.strip() == "</UPF>":
-                break
+        if line.strip() == "</UPF>":
+            break
+    return "".join(processed)
+
+def iter_parse(source):
+    """iterate through the xml file (name or file object), return a dictionary flattened
+    from the tree. Each element is consumed and cleared once its end tag is met, so that
+    the large numerical blocks will not be kept twice in memory"""
+    parsed = {}
+    for _, elem in ET.iterparse(source, events=("end",)):
+        section = {elem.tag: {"attrib": dict(elem.attrib), "data": elem.text}}
+        parsed.update(postprocess(section))
+        elem.clear()
+    return parsed
 
 import SIAB.io.pseudopotential.tools.basic as siptb
+def _decompose(data: str):
+    """return the decomposed numbers if data is numeric, otherwise the data itself"""
+    try:
+        return siptb.decompose_data(data)
+    except ValueError:
+        return data
+
 def postprocess(parsed: dict):
 
     for section in parsed:
         """first the data"""
         if parsed[section]["data"] is not None:
-            parsed[section]["data"] = parsed[section]["data"].strip()
-            if siptb.is_numeric_data(parsed[section]["data"]):
-                parsed[section]["data"] = siptb.decompose_data(parsed[section]["data"])
+            parsed[section]["data"] = _decompose(parsed[section]["data"].strip())
         """then the attributes"""
         if parsed[section]["attrib"] is not None:
             for attrib in parsed[section]["attrib"]:
-                parsed[section]["attrib"][attrib] = parsed[section]["attrib"][attrib].strip()
-                if siptb.is_numeric_data(parsed[section]["attrib"][attrib]):
-                    parsed[section]["attrib"][attrib] = siptb.decompose_data(parsed[section]["attrib"][attrib])
-                elif parsed[section]["attrib"][attrib] == "T":
+                parsed[section]["attrib"][attrib] = _decompose(parsed[section]["attrib"][attrib].strip())
+                if parsed[section]["attrib"][attrib] == "T":
                     parsed[section]["attrib"][attrib] = True
                 elif parsed[section]["attrib"][attrib] == "F":
                     parsed[section]["attrib"][attrib] = False
@@ -49,9 +63,4 @@ def postprocess(parsed: dict):
 
 def parse(fname: str):
     """parse the pseudopotential file, return a dictionary"""
-    preprocess(fname)
-    tree = ET.parse(fname)
-    root = tree.getroot()
-    parsed = iter_tree(root)
-    postprocess(parsed)
-    return parsed
+    return iter_parse(io.StringIO(preprocess(fname)))
@@ -53,6 +53,22 @@ def determine_type(parsed: dict):
     
     raise ValueError("Pseudopotential type not recognized")
 
+SEQUENCE = ["S", "P", "D", "F", "G", "H", "I", "K", "L", "M", "N"]
+def _to_list(result: dict) -> list:
+    """convert the dict of sublayers indexed by angular momentum symbol to list"""
+    result_list = []
+    for isym, symbol in enumerate(SEQUENCE):
+        if symbol in result:
+            result_list.append(result[symbol])
+        else:
+            # it is not so intuitive: there may be the case like s, p and f
+            # but no d, then the result_list should be like [[s], [p], [], [f]]
+            if isym >= len(result):
+                break
+            else:
+                result_list.append([])
+    return result_list
+
 def val_conf(parsed: dict):
     """extract valence electron configuration from pseudopotential file
     return element symbol followed by a list of lists, 
@@ -106,7 +122,6 @@ def ONCV_parser(parsed: dict) -> list:
                 if len(line.split()) >= 3:
                     reference_config.append(line)
     # reversely read the reference_config
-    sequence = ["S", "P", "D", "F", "G", "H", "I", "K", "L", "M", "N"]
     reference_config.reverse()
     for line in reference_config:
         if zval <= 0:
@@ -114,30 +129,18 @@ def ONCV_parser(parsed: dict) -> list:
         else:
             words = line.split()
             index = int(words[1])
-            symbol = sequence[index]
+            symbol = SEQUENCE[index]
             if symbol not in result:
                 result[symbol] = []
             result[symbol].append(words[0]+symbol)
             zval -= float(words[2])
-    # then convert to list
-    result_list = []
-    for isym, symbol in enumerate(sequence):
-        if symbol in result:
-            result_list.append(result[symbol])
-        else:
-            if isym >= len(result):
-                break
-            else:
-                result_list.append([])
-    return parsed["PP_HEADER"]["attrib"]["element"], result_list
+    return parsed["PP_HEADER"]["attrib"]["element"], _to_list(result)
 
 def GBRV_parser(parsed: dict) -> list:
 
     contents = parsed["PP_HEADER"]["data"]
     lines = [line.strip() for line in contents.split("\n")]
 
-    sequence = ["S", "P", "D", "F", "G", "H", "I", "K", "L", "M", "N"]
-
     result = {}
     read_valence_config = False
     for line in lines:
@@ -154,17 +157,7 @@ def GBRV_parser(parsed: dict) -> list:
                     result[symbol] = []
                 result[symbol].append(words[0])
     
-    # then convert to list
-    result_list = []
-    for isym, symbol in enumerate(sequence):
-        if symbol in result:
-            result_list.append(result[symbol])
-        else:
-            if isym >= len(result):
-                break
-            else:
-                result_list.append([])
-    return parsed["PP_HEADER"]["attrib"]["element"], result_list
+    return parsed["PP_HEADER"]["attrib"]["element"], _to_list(result)
 
 def ATOMPAW_parser(parsed: dict) -> list:
 
@@ -173,8 +166,6 @@ def ATOMPAW_parser(parsed: dict) -> list:
     contents = parsed["PP_INFO"]["data"]
     lines = [line.strip() for line in contents.split("\n")]
     
-    sequence = ["S", "P", "D", "F", "G", "H", "I", "K", "L", "M", "N"]
-
     nmax = []
     norb = []
     iorb = 0
@@ -199,24 +190,14 @@ def ATOMPAW_parser(parsed: dict) -> list:
                     while iorb >= sum(norb[:present_l]):
                         present_l += 1
                     present_n += iorb - sum(norb[:present_l - 1]) + present_l - 1
-                    symbol = sequence[present_l - 1]
+                    symbol = SEQUENCE[present_l - 1]
                     if symbol not in result:
                         result[symbol] = []
                     result[symbol].append(str(present_n)+symbol)
                 else:
                     raise ValueError("Unknown line in valelec_config: {}".format(line))
                 iorb += 1
-    # then convert to list
-    result_list = []
-    for isym, symbol in enumerate(sequence):
-        if symbol in result:
-            result_list.append(result[symbol])
-        else:
-            if isym >= len(result):
-                break
-            else:
-                result_list.append([])
-    return parsed["PP_HEADER"]["attrib"]["element"], result_list
+    return parsed["PP_HEADER"]["attrib"]["element"], _to_list(result)
 
 def ADC_parser(parsed: dict) -> list:
 
@@ -249,19 +230,4 @@ If not happy with this, please change the code in SIAB/io/pseudopotential/tools/
                 continue
             result.setdefault(words[0][-1], []).append(words[0])
             
-    # then convert to list
-    sequence = ["S", "P", "D", "F", "G", "H", "I", "K", "L", "M", "N"]
-    result_list = []
-
-    for isym, symbol in enumerate(sequence):
-        if symbol in result:
-            result_list.append(result[symbol])
-        else:
-            # it is not so intuitive: there may be the case like s, p and f
-            # but no d, then the result_list should be like [[s], [p], [], [f]]
-            if isym >= len(result):
-                break
-            else:
-                result_list.append([])
-
-    return parsed["PP_HEADER"]["attrib"]["element"], result_list
+    return parsed["PP_HEADER"]["attrib"]["element"], _to_list(result)
@@ -8,13 +8,13 @@ def is_numeric_data(data):
         return False
 
 def decompose_data(data):
-    """to decompose all numbers in one line, but need to judge whether int or float"""
-    if re.match(r"^\s*[+-]?\d+(\.\d*)([eE][+-]?\d+)?(\s+[+-]?\d+(\.\d*)([eE][+-]?\d+)?)*\s*$", data):
-        return [float(x) for x in data.split()] if " " in data else float(data.strip())
-    elif re.match(r"^\s*[+-]?\d+(\s+[+-]?\d+)*\s*$", data):
-        return [int(x) for x in data.split()] if " " in data else int(data.strip())
-    else:
+    """to decompose all numbers in one line, but need to judge whether int or float.
+    Data is converted in bulk, once there is decimal point or exponent, all will be float"""
+    if not is_numeric_data(data):
         raise ValueError("data is not numeric")
+    dtype = float if re.search(r"[.eE]", data) else int
+    values = list(map(dtype, data.split()))
+    return values if len(values) > 1 else values[0]
 
 def orbconf_fromxzyp(zeta_notation: str, 
                      minimal_basis: list = None,
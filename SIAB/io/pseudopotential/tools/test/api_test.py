@@ -1,4 +1,5 @@
 import unittest
+import types
 import SIAB.io.pseudopotential.api as siapi
 
 class TestAPI(unittest.TestCase):
@@ -8,6 +9,54 @@ class TestAPI(unittest.TestCase):
         parsed = siapi.parse(fname=fname)
         self.assertEqual(parsed["PP_HEADER"]["attrib"]["element"], "Mn")
 
+    def test_parse_nowrap(self):
+        """file without <UPF version=...> and </UPF>, e.g. GBRV, is wrapped before parsing,
+        the file itself is not modified"""
+        fname = "./SIAB/io/pseudopotential/tools/test/support/Tl_nowrap.upf"
+        with open(fname, "r") as f:
+            content = f.read()
+        parsed = siapi.parse(fname=fname)
+        self.assertListEqual(list(parsed.keys()), ["PP_INPUTFILE", "PP_INFO", "PP_HEADER", "UPF"])
+        self.assertEqual(parsed["PP_HEADER"]["attrib"]["element"], "Tl")
+        with open(fname, "r") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_parse_cached(self):
+        fname = "./SIAB/io/pseudopotential/tools/test/support/Mn_adc.upf"
+        parsed = siapi.parse(fname=fname)
+        self.assertIs(siapi.parse(fname=fname), parsed)
+        info = siapi.extract_ppinfo_forsiab(fname=fname)
+        self.assertIs(siapi.extract_ppinfo_forsiab(fname=fname), info)
+        with self.assertRaises(TypeError):
+            info["element"] = "Fe"
+
+    def test_extract_many(self):
+        fname = "./SIAB/io/pseudopotential/tools/test/support/Mn_adc.upf"
+        infos = siapi.extract_many([fname, fname])
+        self.assertListEqual(list(infos.keys()), [fname])
+        self.assertEqual(infos[fname]["element"], "Mn")
+        # the same file with different names is only extracted once
+        fname_ = fname[2:]
+        infos = siapi.extract_many([fname, fname_])
+        self.assertListEqual(list(infos.keys()), [fname, fname_])
+        self.assertIs(infos[fname], infos[fname_])
+
+    def test_extract_many_parallel(self):
+        fnames = ["./SIAB/io/pseudopotential/tools/test/support/Mn_adc.upf",
+                  "./SIAB/io/pseudopotential/tools/test/support/Tl_nowrap.upf"]
+        siapi._extract_ppinfo_cached.cache_clear()
+        infos = siapi.extract_many(fnames)
+        self.assertListEqual(list(infos.keys()), fnames)
+        self.assertEqual(infos[fnames[0]]["element"], "Mn")
+        self.assertEqual(infos[fnames[1]]["element"], "Tl")
+        for fname in fnames:
+            # results from worker processes are the same as serial ones, and read-only
+            self.assertIsInstance(infos[fname], types.MappingProxyType)
+            self.assertDictEqual(dict(infos[fname]), siapi._extract_ppinfo_impl(fname))
+            # results from worker processes are put into cache
+            self.assertIs(siapi.extract_ppinfo_forsiab(fname=fname), infos[fname])
+        self.assertDictEqual(siapi._prefetched, {})
+
     def test_towards_siab(self):
         fname = "./SIAB/io/pseudopotential/tools/test/support/Mn_adc.upf"
         info = siapi.towards_siab(fname=fname)
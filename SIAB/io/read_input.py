@@ -277,6 +277,8 @@ def siab_settings(user_settings: dict, minimal_basis: list, z_val: float):
         "spill_coefs": user_settings.get("spill_coefs", [2.0, 1.0]),
         "spill_thr": user_settings.get("spill_thr", 1e-8),
         "nthreads_rcut": user_settings.get("nthreads_rcut", -1),
+        "save_plot": user_settings.get("save_plot", False),
+        "rcut_parallel": user_settings.get("rcut_parallel", False),
         "orbitals": [{} for _ in range(len(user_settings["orbitals"]))],
         "jY_type": user_settings.get("jY_type", "reduced")
     }
@@ -321,7 +323,8 @@ def environment_settings(user_settings: dict):
     return {
         "environment": user_settings["environment"],
         "mpi_command": user_settings["mpi_command"],
-        "abacus_command": user_settings["abacus_command"]
+        "abacus_command": user_settings["abacus_command"],
+        "max_parallel_jobs": user_settings.get("max_parallel_jobs", 1)
     }
 
 def structure_settings(user_settings: dict):
@@ -940,6 +943,8 @@ STRU4       trimer      18      2       1      2.6 3.2 3.8
             'jY_type': 'reduced',
             'optimizer': 'pytorch.SWAT', 
             'nthreads_rcut': -1,
+            'save_plot': False,
+            'rcut_parallel': False,
             'max_steps': 200, 
             'spill_coefs': [2.0, 1.0], 
             'spill_thr': 1e-08,
@@ -959,7 +964,8 @@ STRU4       trimer      18      2       1      2.6 3.2 3.8
         })
         self.assertDictEqual(result[3], {'environment': '', 
                                          'mpi_command': 'mpirun -np 1', 
-                                         'abacus_command': 'abacus'})
+                                         'abacus_command': 'abacus',
+                                         'max_parallel_jobs': 1})
         self.assertDictEqual(result[4], {'element': 'Si', 
                                          'pseudo_dir': '/root/abacus-develop/pseudopotentials/SG15_ONCV_v1.0_upf', 
                                          'pseudo_name': 'Si_ONCV_PBE-1.0.upf'})
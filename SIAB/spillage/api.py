@@ -1,8 +1,60 @@
 """this file defines interface between newly implemented spillage optimization algorithm
 with the driver of SIAB"""
+import os
+import re
+import functools
+import itertools
+from collections import namedtuple
+
+@functools.lru_cache(maxsize=128)
+def _orb_mat_rcut_cached(fpath: str, mtime_ns: int, size: int):
+    """mtime_ns and size only take part in the key of cache"""
+    with open(fpath, 'r') as f:
+        for line in f:
+            words = line.split()
+            if len(words) == 2 and words[1] == 'rcut_Jlq':
+                return float(words[0])
+            if line.startswith('<'): # header ends before the first data block
+                break
+    raise ValueError(f"rcut_Jlq not found in the header of {fpath}")
+
+def orb_mat_rcut(fpath: str):
+    """get the rcut of orb_matrix file by only reading its header, instead of parsing the
+    whole file. The result is cached for the same file"""
+    stat = os.stat(fpath)
+    return _orb_mat_rcut_cached(os.path.realpath(fpath), stat.st_mtime_ns, stat.st_size)
+
+OrbParams = namedtuple("OrbParams", ["nzeta", "folder", "nbands_ref", "nzeta_from"])
+def orbparams_soa(orbitals: list):
+    """transpose the list of orbital settings (dicts) to one list per attribute, so that
+    the attributes do not need to be plucked from dicts everywhere"""
+    return OrbParams(*[[orb[key] for orb in orbitals] for key in OrbParams._fields])
+
+def _stack_nzeta(nzeta: list, lmax: int):
+    """stack nzeta of orbitals into a (norb, lmax+1) int array, the l that an orbital
+    does not have is padded with -1"""
+    import numpy as np
+    out = np.full((len(nzeta), lmax + 1), -1, dtype=int)
+    for i, nz in enumerate(nzeta):
+        out[i, :len(nz)] = nz
+    return out
+
+def config_indexing(orb_folders: list, folders: list):
+    """flatten the folders of all reference shapes to be the configurations (deduplicated
+    with the order kept), and index the configurations used by each orbital, whose
+    folders are given by `orb_folders`, i.e. the `folder` column of OrbParams.
+
+    Returns:
+    configs: list of str, the folders
+    iconfs: list of list of int, indices of configurations for each orbital
+    """
+    configs = list(dict.fromkeys(itertools.chain.from_iterable(folders)))
+    iconf = {f: i for i, f in enumerate(configs)}
+    iconfs = [[iconf[f] for f in orb_folder] for orb_folder in orb_folders]
+    return configs, iconfs
+
 def orbgen_of_rcut(rcut: float, siab_settings: dict, folders: list):
     """generate orbitals for one single rcut value"""
-    import os
     import numpy as np
     from SIAB.spillage.spillage import Spillage, initgen
     from SIAB.spillage.datparse import read_orb_mat
@@ -10,19 +62,19 @@ def orbgen_of_rcut(rcut: float, siab_settings: dict, folders: list):
 
     print(f"ORBGEN: Optimizing orbitals for rcut = {rcut} au", flush = True)
     # folders will be directly the `configs`
-    folders = list(set([item for sublist in folders for item in sublist]))
-    iconfs = [[] for _ in range(len(siab_settings['orbitals']))]
-    for iorb, orb in enumerate(siab_settings['orbitals']):
-        iconfs[iorb] = [folders.index(f) for f in orb['folder']]
+    orbparams = orbparams_soa(siab_settings['orbitals'])
+    folders, iconfs = config_indexing(orbparams.folder, folders)
     reduced = siab_settings.get('jY_type', "reduced")
     orbgen = Spillage(reduced in ["reduced", "nullspace", "svd"])
     # load orb_matix with correct rcut
     fov = None
     for folder in folders:
         for fov_, fop_ in orb_matrices(folder):
-            ov, op = map(read_orb_mat, [fov_, fop_])
-            assert ov['rcut'] == op['rcut'], "Data violation: rcut of ov and op matrices are different"
-            if np.abs(ov['rcut'] - rcut) < 1e-10:
+            # only parse the whole files whose rcut is the present one
+            rcut_ov, rcut_op = map(orb_mat_rcut, [fov_, fop_])
+            assert rcut_ov == rcut_op, "Data violation: rcut of ov and op matrices are different"
+            if np.abs(rcut_ov - rcut) < 1e-10:
+                ov, op = map(read_orb_mat, [fov_, fop_])
                 print(f"ORBGEN: jy_jy, mo_jy and mo_mo matrices loaded from {fov_} and {fop_}", flush = True)
                 orbgen.add_config(ov, op, siab_settings.get('spill_coefs', [0.0, 1.0]))
                 fov = fov_ if fov is None else fov
@@ -30,49 +82,76 @@ def orbgen_of_rcut(rcut: float, siab_settings: dict, folders: list):
     monomer_dir = "-".join([symbol, "monomer"]) # weak binding
     ov = read_orb_mat(os.path.join(monomer_dir, fov.replace('\\', '/').split('/')[-1]))
     # calculate the firs param of function initgen
-    lmax = max([len(orb['nzeta']) for orb in siab_settings['orbitals']]) - 1
+    lmax = max([len(nz) for nz in orbparams.nzeta]) - 1
     # calculate maxial number of zeta for each l
-    nzeta_max = [(lambda nzeta: nzeta + (lmax + 1 - len(nzeta))*[-1])(orb['nzeta']) for orb in siab_settings['orbitals']]
-    nzeta_max = [max([orb[i] for orb in nzeta_max]) for i in range(lmax + 1)]
+    nzeta_max = _stack_nzeta(orbparams.nzeta, lmax).max(axis=0).tolist()
     coefs_init = initgen(nzeta_max, ov, reduced)
     # prepare opt params
     options = {'ftol': 0, 'gtol': 1e-6, 'maxiter': siab_settings.get('max_steps', 2000), 'disp': True, 'maxcor': 20}
     nthreads = siab_settings.get('nthreads_rcut', 1)
     # run optimization for each level hierarchy
-    nzeta = [orb['nzeta'] for orb in siab_settings['orbitals']] # element of this list will always be unique
-    iorbs_ref = [orb['nzeta_from'] for orb in siab_settings['orbitals']] # index of reference orbitals
-    iorbs_ref = list(map(lambda x: nzeta.index(x) if x is not None else None, iorbs_ref))
+    # element of orbparams.nzeta will always be unique, index of reference orbitals
+    iorbs_ref = [orbparams.nzeta.index(x) if x is not None else None for x in orbparams.nzeta_from]
     # optimize orbitals
-    coefs = [None for _ in range(len(siab_settings['orbitals']))]
-    for iorb, orb in enumerate(siab_settings['orbitals']):
-        print(f"""ORBGEN: optimization on level {iorb + 1} (with # of zeta functions for each l: {orb['nzeta']}), 
-        based on orbital ({orb['nzeta_from']})""", flush = True)
+    coefs = [None for _ in range(len(orbparams.nzeta))]
+    for iorb, (nzeta, nzeta_from, nbands_ref) in enumerate(zip(orbparams.nzeta, orbparams.nzeta_from, orbparams.nbands_ref)):
+        print(f"""ORBGEN: optimization on level {iorb + 1} (with # of zeta functions for each l: {nzeta}), 
+        based on orbital ({nzeta_from})""", flush = True)
         coef_inner = coefs[iorbs_ref[iorb]] if iorbs_ref[iorb] is not None else None
-        coefs_shell = orbgen.opt(coefs_subset(orb['nzeta'], orb['nzeta_from'], coefs_init), coef_inner, iconfs[iorb], range(orb['nbands_ref']), options, nthreads)
+        coefs_shell = orbgen.opt(coefs_subset(nzeta, nzeta_from, coefs_init), coef_inner, iconfs[iorb], range(nbands_ref), options, nthreads)
         coefs[iorb] = merge(coef_inner, coefs_shell, 2) if coef_inner is not None else coefs_shell
         print(f"ORBGEN: End optimization on level {iorb + 1} orbital, merge with previous orbital shell(s).", flush = True)
     return coefs
 
+def orbgen_and_save(rcut: float, siab_settings: dict, calculation_settings: list, folders: list):
+    """generate orbitals for one single rcut value and save them"""
+    coefs_tot = orbgen_of_rcut(rcut, siab_settings, folders)
+    # because element does not really matter when optimizing orbitals, the only thing
+    # has element information is the name of folder. So we extract the element from the
+    # first folder name. Not elegant, we know.
+    save_orb(coefs_tot, folders[0][0].split("-")[0], calculation_settings[0]["ecutwfc"],
+             rcut, orbparams_soa(siab_settings['orbitals']).nzeta,
+             siab_settings.get('jY_type', "reduced"), siab_settings.get('save_plot', False))
+
+RCUT_WORKER_THREADS_ENV = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+def _limit_threads(nthreads: int):
+    """initializer of the worker processes optimizing orbitals of different rcut, limit
+    the threads of BLAS/OpenMP used by numpy and scipy. Only takes effect if numpy has
+    not been imported in the process yet"""
+    for var in RCUT_WORKER_THREADS_ENV:
+        os.environ[var] = str(nthreads)
+
 def iter(siab_settings: dict, calculation_settings: list, folders: list):
     """Loop over rcut values and yield orbitals"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
     rcuts = calculation_settings[0]["bessel_nao_rcut"]
     rcuts = [rcuts] if not isinstance(rcuts, list) else rcuts
-    for rcut in rcuts: # can be parallelized here
-        coefs_tot = orbgen_of_rcut(rcut, siab_settings, folders)
-        # because element does not really matter when optimizing orbitals, the only thing
-        # has element information is the name of folder. So we extract the element from the
-        # first folder name. Not elegant, we know.
-        save_orb(coefs_tot, folders[0][0].split("-")[0], calculation_settings[0]["ecutwfc"],
-                 rcut, [orb['nzeta'] for orb in siab_settings['orbitals']],
-                 siab_settings.get('jY_type', "reduced"))
+    run = functools.partial(orbgen_and_save, siab_settings=siab_settings,
+                            calculation_settings=calculation_settings, folders=folders)
+    # optimizations on different rcut are independent, run them in separate processes
+    # if required, each process will use nthreads_rcut threads, both for the threads
+    # of Spillage.opt and for BLAS/OpenMP
+    if siab_settings.get('rcut_parallel', False) and len(rcuts) > 1:
+        nthreads = max(1, siab_settings.get('nthreads_rcut', 1))
+        nprocs = max(1, min(len(rcuts), (os.cpu_count() or 1) // nthreads))
+        # workers are spawned as fresh interpreters instead of forked, so that the thread
+        # limit is set by the initializer before numpy is imported in them
+        with ProcessPoolExecutor(max_workers=nprocs, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_limit_threads, initargs=(nthreads,)) as executor:
+            list(executor.map(run, rcuts))
+    else:
+        for rcut in rcuts:
+            run(rcut)
     return
 
 def peel(coef, nzeta_lvl_tot):
-    from copy import deepcopy
-    coef_lvl = [deepcopy(coef)]
-    for nzeta_lvl in reversed(nzeta_lvl_tot):
-        coef_lvl.append([[coef_lvl[-1][l].pop(0) for _ in range(nzeta)] for l,nzeta in enumerate(nzeta_lvl)])
-    return coef_lvl[1:][::-1]
+    """split coef [l][zeta] into shells. `nzeta_lvl_tot` is the accumulated number of zeta
+    functions of each level, the level i takes zeta functions from nzeta_lvl_tot[i-1] to
+    nzeta_lvl_tot[i] for each l"""
+    nzeta_prev = [[]] + nzeta_lvl_tot[:-1]
+    return [[coef[l][(nz0[l] if l < len(nz0) else 0):nz] for l, nz in enumerate(nzeta_lvl)]
+            for nz0, nzeta_lvl in zip(nzeta_prev, nzeta_lvl_tot)]
 
 def coefs_subset(nzeta, nzeta0, data):
     """
@@ -85,19 +164,17 @@ def coefs_subset(nzeta, nzeta0, data):
     q: q of j(qr)Y(q)
     """
     if nzeta0 is None:
-        return [[[ data[l][iz] for iz in range(nz) ] for l, nz in enumerate(nzeta)]]
+        return [[list(data[l][:nz]) for l, nz in enumerate(nzeta)]]
     assert len(nzeta) >= len(nzeta0), f"(at least) size error of nzeta and nzeta0: {len(nzeta)} and {len(nzeta0)}"
     nzeta0 = nzeta0 + (len(nzeta) - len(nzeta0))*[0]
     for nz, nz0 in zip(nzeta, nzeta0):
         assert nz >= nz0, f"not hirarcal structure of these two nzeta set: {nzeta0} and {nzeta}"
-    iz_subset = [list(range(iz, jz)) for iz, jz in zip(nzeta0, nzeta)]
-    # then get coefs from data with iz_subset, the first dim of iz_subset is l
-    #               l  zeta                 l  list of zeta
-    return [[[ data[l][j] for j in jz ] for l, jz in enumerate(iz_subset)]]
+    # the subset of each l is a contiguous range of zeta, slice instead of indexing one by one
+    return [[list(data[l][nz0:nz]) for l, (nz0, nz) in enumerate(zip(nzeta0, nzeta))]]
 
+ORB_MAT_OLD = re.compile(r"orb_matrix\.([01])\.dat$")
+ORB_MAT_NEW = re.compile(r"orb_matrix_rcut(\d+)deriv([01])\.dat$")
 def orb_matrices(folder: str):
-    import os
-    import re
     """
     on the refactor of ABACUS Numerical_Basis class
     
@@ -112,20 +189,23 @@ def orb_matrices(folder: str):
     Returns:
     tuple of str: the file names of orb_matrix and its derivative (absolute path)
     """
-    old = r"orb_matrix.([01]).dat"
-    new = r"orb_matrix_rcut(\d+)deriv([01]).dat"
-
-    files = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))]
-    # convert to absolute path
-    old_files = [os.path.join(folder, f) for f in files if re.match(old, f)]
-    new_files = [os.path.join(folder, f) for f in files if re.match(new, f)]
+    old_files, new_files = [], []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            # convert to absolute path
+            if ORB_MAT_OLD.match(entry.name):
+                old_files.append(os.path.join(folder, entry.name))
+            elif ORB_MAT_NEW.match(entry.name):
+                new_files.append(os.path.join(folder, entry.name))
     # not allowed to have both old and new files
     assert not (old_files and new_files)
     assert len(old_files) == 2 or not old_files
     assert len(new_files) % 2 == 0 or not new_files
 
     # make old_files to be list of tuples, if not None
-    old_files = [(old_files[0], old_files[1])] if old_files else None
+    old_files = [tuple(sorted(old_files))] if old_files else None
     # new files are sorted by rcut and deriv
     new_files = sorted(new_files) if new_files else None
     # similarly, make new_files to be list of tuples, if not None
@@ -137,20 +217,33 @@ def orb_matrices(folder: str):
     for f in files:
         yield f
 
-def save_orb(coefs_tot, elem, ecut, rcut, nzeta, jY_type: str = "reduced"):
-    import numpy as np
+@functools.lru_cache(maxsize=None)
+def _pyplot():
+    """import matplotlib.pyplot with the non-interactive backend Agg forced, because
+    figures are only saved to file. Probing GUI backends on headless nodes is slow and
+    may hang. The backend is only set once for each process"""
+    import matplotlib
+    matplotlib.use("Agg", force=True)
     import matplotlib.pyplot as plt
+    return plt
+
+def save_orb(coefs_tot, elem, ecut, rcut, nzeta, jY_type: str = "reduced", plot: bool = True):
+    import numpy as np
     from SIAB.spillage.radial import build_reduced, build_raw, coeff_normalized2raw
-    from SIAB.spillage.plot import plot_chi
     from SIAB.spillage.orbio import write_nao, write_param
     import os, uuid
     """
-    Plot the orbital and save .orb file
+    Save .orb file, and plot the orbital if plot is True
     """
+    if plot:
+        # matplotlib is only imported when plotting is really needed
+        plt = _pyplot()
+        from SIAB.spillage.plot import plot_chi
     assert len(nzeta) == len(coefs_tot)
     
     dr = 0.01
-    r = np.linspace(0, rcut, int(rcut/dr)+1)
+    r = np.linspace(0, rcut, int(rcut/dr)+1) # shared by all levels
+    syms = "SPDFGHIKLMNOQRTUVWXYZ".lower()
 
     for i, coefs in enumerate(coefs_tot): # loop over all levels of orbitals
         assert len(coefs) == 1, "multiple elements?"
@@ -160,17 +253,18 @@ def save_orb(coefs_tot, elem, ecut, rcut, nzeta, jY_type: str = "reduced"):
             coeff_raw = coeff_normalized2raw(coefs, rcut)
             chi = build_raw(coeff_normalized2raw(coeff_raw[0], rcut), rcut, r, 0.0, True, True)
 
-        syms = "SPDFGHIKLMNOQRTUVWXYZ".lower()
         nz = nzeta[i]
         suffix = "".join([f"{nz[j]}{syms[j]}" for j in range(len(nz))])
 
         folder, subfolder = f"{elem}_{suffix}", f"{rcut}au_{ecut}Ry"
         os.makedirs(f"{folder}/{subfolder}", exist_ok=True)
-        fpng = f"{elem}_gga_{rcut}au_{ecut}Ry_{suffix}.png"
-        plot_chi(chi, r, save=fpng)
-        os.rename(fpng, os.path.join(f"{folder}/{subfolder}", fpng))
-        plt.close()
-        forb = fpng.replace(".png", ".orb")
+        fname = f"{elem}_gga_{rcut}au_{ecut}Ry_{suffix}"
+        if plot:
+            fpng = fname + ".png"
+            plot_chi(chi, r, save=fpng)
+            os.rename(fpng, os.path.join(f"{folder}/{subfolder}", fpng))
+            plt.close()
+        forb = fname + ".orb"
         write_nao(forb, elem, ecut, rcut, len(r), dr, chi)
         fparam = str(uuid.uuid4())
         write_param(fparam, coefs[0], rcut, 0.0, elem)
@@ -252,6 +346,26 @@ class TestAPI(unittest.TestCase):
         # remove the folder
         os.rmdir(test_folder)
 
+    def test_orb_mat_rcut(self):
+        fpath = "./SIAB/interface/test/support/Si-trimer-2.6/orb_matrix_rcut6deriv1.dat"
+        self.assertEqual(orb_mat_rcut(fpath), 6.0)
+
+    def test_config_indexing(self):
+        folders = [["Si-dimer-1.8", "Si-dimer-2.0"], ["Si-trimer-1.9", "Si-dimer-2.0"]]
+        orb_folders = [["Si-dimer-1.8", "Si-dimer-2.0"], ["Si-trimer-1.9", "Si-dimer-2.0"]]
+        configs, iconfs = config_indexing(orb_folders, folders)
+        self.assertListEqual(configs, ["Si-dimer-1.8", "Si-dimer-2.0", "Si-trimer-1.9"])
+        self.assertListEqual(iconfs, [[0, 1], [2, 1]])
+
+    def test_orbparams_soa(self):
+        orbitals = [{"nzeta": [1, 1], "folder": [0], "nbands_ref": 4, "nzeta_from": None},
+                    {"nzeta": [2, 2, 1], "folder": [0, 1], "nbands_ref": 6, "nzeta_from": [1, 1]}]
+        orbparams = orbparams_soa(orbitals)
+        self.assertListEqual(orbparams.nzeta, [[1, 1], [2, 2, 1]])
+        self.assertListEqual(orbparams.folder, [[0], [0, 1]])
+        self.assertListEqual(orbparams.nbands_ref, [4, 6])
+        self.assertListEqual(orbparams.nzeta_from, [None, [1, 1]])
+
     def test_nzeta_to_initgen(self):
         import numpy as np
         nz1 = np.random.randint(0, 5, 2).tolist()
@@ -259,12 +373,20 @@ class TestAPI(unittest.TestCase):
         nz3 = np.random.randint(0, 5, 4).tolist()
         nz4 = np.random.randint(0, 5, 5).tolist()
         lmax = max([len(nz) for nz in [nz1, nz2, nz3, nz4]]) - 1
-        total_init = [(lambda nzeta: nzeta + (lmax + 1 - len(nzeta))*[-1])(nz) for nz in [nz1, nz2, nz3, nz4]]
-        total_init = [max([orb[i] for orb in total_init]) for i in range(lmax + 1)]
+        total_init = _stack_nzeta([nz1, nz2, nz3, nz4], lmax).max(axis=0).tolist()
         for iz in range(lmax + 1):
             self.assertEqual(total_init[iz], max([
                 nz[iz] if iz < len(nz) else -1 for nz in [nz1, nz2, nz3, nz4]]))
 
+    def test_peel(self):
+        coef = [[[1.0], [2.0], [3.0]], [[4.0], [5.0], [6.0]], [[7.0], [8.0]]]
+        self.assertEqual(peel(coef, [[1, 1], [2, 2, 1], [3, 3, 2]]),
+                         [[[[1.0]], [[4.0]]],
+                          [[[2.0]], [[5.0]], [[7.0]]],
+                          [[[3.0]], [[6.0]], [[8.0]]]])
+        # coef itself is not modified
+        self.assertEqual(coef, [[[1.0], [2.0], [3.0]], [[4.0], [5.0], [6.0]], [[7.0], [8.0]]])
+
     def test_coefs_subset(self):
         import numpy as np
         nz3 = [3, 3, 2]
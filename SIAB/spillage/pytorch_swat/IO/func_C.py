@@ -2,25 +2,34 @@ from SIAB.spillage.pytorch_swat.util import *
 import torch
 import numpy as np
 
-def random_C_init(info_element):
+def random_C_init(info_element, requires_grad: bool = True):
     """ C[it][il][ie,iu]    <jY|\phi> """
     print("\nORBGEN: use random initial guess for coefficients of jY basis functions.", flush=True)
     C = dict()
     for it in info_element.keys():
-        C[it] = ND_list(info_element[it].Nl)
+        C[it] = [None] * info_element[it].Nl
+        Nu = info_element[it].Nu[:info_element[it].Nl]
+        # sample all l of one type at once, then distribute columns to each l
+        initial_guess = np.random.uniform(-1,1, (info_element[it].Ne, sum(Nu)))
+        offsets = np.cumsum([0] + Nu)
         for il in range(info_element[it].Nl):
-            initial_guess = np.random.uniform(-1,1, (info_element[it].Ne, info_element[it].Nu[il]))
-            C[it][il] = torch.tensor(initial_guess, dtype=torch.float64, requires_grad=True)
+            C[it][il] = torch.tensor(initial_guess[:, offsets[il]:offsets[il+1]], dtype=torch.float64, requires_grad=requires_grad)
     return C
 
-def identity_C_init(info_element):
+def identity_C_init(info_element, requires_grad: bool = True):
     """ C[it][il][ie,iu]    <jY|\phi> """
     print("\nORBGEN: use identity initial guess for coefficients of jY basis functions.", flush=True)
     C = dict()
     for it in info_element.keys():
-        C[it] = ND_list(info_element[it].Nl)
+        C[it] = [None] * info_element[it].Nl
+        Nu = info_element[it].Nu[:info_element[it].Nl]
+        # one zero buffer for all l of one type, stamp the diagonal of each l's columns
+        initial_guess = torch.zeros(info_element[it].Ne, sum(Nu), dtype=torch.float64)
+        offsets = np.cumsum([0] + Nu)
         for il in range(info_element[it].Nl):
-            C[it][il] = torch.eye(info_element[it].Ne, info_element[it].Nu[il], dtype=torch.float64, requires_grad=True)
+            idiag = torch.arange(min(info_element[it].Ne, Nu[il]))
+            initial_guess[idiag, int(offsets[il]) + idiag] = 1.0
+            C[it][il] = initial_guess[:, offsets[il]:offsets[il+1]].clone().requires_grad_(requires_grad)
     return C
 
 def read_C_init(file_name, info_element, guess: str = "random"):
@@ -30,7 +39,8 @@ def read_C_init(file_name, info_element, guess: str = "random"):
     iu: index of radial orbital of angular momentum l
     ie: index of truncated spherical Bessel function of present radial orbital
     """
-    C = random_C_init(info_element) if guess == "random" else identity_C_init(info_element)
+    # C will be partly overwritten by coefficients read, require grad only after that
+    C = random_C_init(info_element, False) if guess == "random" else identity_C_init(info_element, False)
 
     with open(file_name,"r") as file:
     
@@ -39,63 +49,78 @@ def read_C_init(file_name, info_element, guess: str = "random"):
                 line=None
                 break
         ignore_line(file,1)
-    
-        C_read_index = set()
-        while True:
-            line = file.readline().strip()
-            if line.startswith("Type"):
-                it,il,iu = file.readline().split()
-                il = int(il)
-                iu = int(iu)-1
-                C_read_index.add((it,il,iu))
-                # split line into list
-                line = file.readline().split()
-                # for each truncated spherical Bessel function
-                for ie in range(info_element[it].Ne):
-                    # if the line is empty, read the next line and split it into list.
-                    if not line:
-                        line = file.readline().split()
-                    # pop the first element of the list and convert it to float as coefficient
-                    C[it][il].data[ie,iu] = float(line.pop(0))
-            elif line.startswith("</Coefficient>"):
-                break
-            else:
-                raise IOError("unknown line in read_C_init "+file_name+"\n"+line)
+
+        # read the rest in one call and tokenize the whole coefficient block at once
+        block = file.read().split("</Coefficient>", 1)
+        if len(block) < 2:
+            raise IOError("</Coefficient> not found in read_C_init "+file_name)
+        tokens = block[0].split()
+
+    # first locate all radial orbitals and collect their coefficients
+    blocks, coefs = [], []
+    cur = 0
+    while cur < len(tokens):
+        # header of each radial orbital: Type L Zeta-Orbital, followed by it, il, iu
+        if tokens[cur] != "Type":
+            raise IOError("unknown line in read_C_init "+file_name+"\n"+" ".join(tokens[cur:cur+3]))
+        it, il, iu = tokens[cur+3], int(tokens[cur+4]), int(tokens[cur+5])-1
+        cur += 6
+        # coefficients of all truncated spherical Bessel functions
+        Ne = info_element[it].Ne
+        blocks.append((it, il, iu, len(coefs), Ne))
+        coefs.extend(tokens[cur:cur+Ne])
+        cur += Ne
+    # then convert all coefficients to float in one call
+    coefs = np.array(coefs, dtype=np.float64)
+
+    C_read_index = set()
+    for it, il, iu, start, Ne in blocks:
+        C_read_index.add((it,il,iu))
+        C[it][il][:,iu] = torch.from_numpy(coefs[start:start+Ne])
+    for C_t in C.values():
+        for C_tl in C_t:
+            C_tl.requires_grad_(True)
     return C, C_read_index
 
-def copy_C(C,info_element):
-    C_copy = dict()
-    for it in info_element.keys():
-        C_copy[it] = ND_list(info_element[it].Nl)
-        for il in range(info_element[it].Nl):
-            C_copy[it][il] = C[it][il].clone()
+def copy_C(C,info_element,C_copy=None):
+    """ snapshot of C, the copy is detached from the autograd graph.
+    If the previous snapshot C_copy is given, its tensors are overwritten in-place
+    when shapes match, instead of allocating new ones """
+    if C_copy is None:
+        C_copy = dict()
+    with torch.no_grad():
+        for it in info_element.keys():
+            if len(C_copy.get(it, [])) != info_element[it].Nl:
+                C_copy[it] = [None] * info_element[it].Nl
+            for il in range(info_element[it].Nl):
+                if C_copy[it][il] is not None and C_copy[it][il].shape == C[it][il].shape:
+                    C_copy[it][il].copy_(C[it][il])
+                else:
+                    C_copy[it][il] = C[it][il].detach().clone()
     return C_copy
     
     
     
 def write_C(fcoef, C, Spillage):
+    lines = ["<Coefficient>"]
+    nTotal = sum(C_tl.shape[1] for C_t in C.values() for C_tl in C_t)
+    lines.append("\t %s Total number of radial orbitals."%nTotal)
+    for it, C_t in C.items():
+        for il, C_tl in enumerate(C_t):
+            # copy to host once for each (it, il), instead of calling .item() on each element
+            C_tl = C_tl.detach().cpu().numpy()
+            # format all coefficients of one radial orbital with a single % operation
+            fmt = "\n".join(["\t %18.14f"] * C_tl.shape[0])
+            for iu in range(C_tl.shape[1]):
+                lines.append("\tType\tL\tZeta-Orbital")
+                lines.append("\t  {0} \t{1}\t    {2}".format(it, il, iu+1))
+                lines.append(fmt % tuple(C_tl[:,iu].tolist()))
+    lines.append("</Coefficient>")
+    lines.append("<Mkb>")
+    lines.append("Left spillage = %.10e"%Spillage.item())
+    lines.append("</Mkb>")
     with open(fcoef, "w") as fhdle:
-        print("<Coefficient>", file = fhdle)
-        #print("\tTotal number of radial orbitals.", file=file)
-        nTotal = 0
-        for it, C_t in C.items():
-            for il, C_tl in enumerate(C_t):
-                for iu in range(C_tl.size()[1]):
-                    nTotal += 1 
-            #nTotal = sum(info["Nu"][it])
-        print("\t %s Total number of radial orbitals."%nTotal , file = fhdle) 
-        #print("\tTotal number of radial orbitals.", file=file)
-        for it, C_t in C.items():
-            for il, C_tl in enumerate(C_t):
-                for iu in range(C_tl.size()[1]):
-                    print("\tType\tL\tZeta-Orbital", file = fhdle)
-                    print("\t  {0} \t{1}\t    {2}".format(it, il, iu+1), file = fhdle)
-                    for ie in range(C_tl.size()[0]):
-                        print("\t", '%18.14f'%C_tl[ie,iu].item(), file = fhdle)
-        print("</Coefficient>", file = fhdle)
-        print("<Mkb>", file = fhdle)
-        print("Left spillage = %.10e"%Spillage.item(), file = fhdle)
-        print("</Mkb>", file = fhdle)
+        fhdle.write("\n".join(lines) + "\n")
 
     
 #def init_C(info):
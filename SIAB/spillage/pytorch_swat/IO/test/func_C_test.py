@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+import torch
+import SIAB.spillage.pytorch_swat.IO.func_C as sspsifc
+from SIAB.spillage.pytorch_swat.util import Info
+
+COEF = """<Coefficient>
+\t 3 Total number of radial orbitals.
+\tType\tL\tZeta-Orbital
+\t  Si \t0\t    1
+\t   0.10000000000000
+\t   0.30000000000000
+\t  -0.50000000000000
+\tType\tL\tZeta-Orbital
+\t  Si \t0\t    2
+\t  -0.20000000000000
+\t   0.40000000000000
+\t   0.60000000000000
+\tType\tL\tZeta-Orbital
+\t  Si \t1\t    1
+\t   1.00000000000000
+\t  -1.50000000000000
+\t   2.25000000000000
+</Coefficient>
+<Mkb>
+Left spillage = 1.5000000000e-03
+</Mkb>
+"""
+
+class TestFuncC(unittest.TestCase):
+
+    def setUp(self):
+        info = Info()
+        info.Ne, info.Nl, info.Nu = 3, 2, [2, 1]
+        self.info_element = {"Si": info}
+        self.C = {"Si": [torch.tensor([[0.1, -0.2], [0.3, 0.4], [-0.5, 0.6]], dtype=torch.float64),
+                         torch.tensor([[1.0], [-1.5], [2.25]], dtype=torch.float64)]}
+        fd, self.fcoef = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.fcoef)
+
+    def test_write_C(self):
+        sspsifc.write_C(self.fcoef, self.C, torch.tensor(1.5e-3, dtype=torch.float64))
+        with open(self.fcoef, "r") as f:
+            self.assertEqual(f.read(), COEF)
+
+    def test_read_C_init(self):
+        sspsifc.write_C(self.fcoef, self.C, torch.tensor(1.5e-3, dtype=torch.float64))
+        for guess in ["random", "identity"]:
+            C, C_read_index = sspsifc.read_C_init(self.fcoef, self.info_element, guess)
+            self.assertSetEqual(C_read_index, {("Si", 0, 0), ("Si", 0, 1), ("Si", 1, 0)})
+            for C_tl, C_tl_ref in zip(C["Si"], self.C["Si"]):
+                self.assertTrue(torch.equal(C_tl.detach(), C_tl_ref))
+                self.assertTrue(C_tl.requires_grad)
+                self.assertTrue(C_tl.is_leaf)
+
+    def test_read_C_init_partial(self):
+        # only the second zeta of l = 0 is given, the others keep the identity guess,
+        # coefficients do not need to be one per line
+        with open(self.fcoef, "w") as f:
+            f.write("<Coefficient>\n"
+                    "\t 1 Total number of radial orbitals.\n"
+                    "\tType\tL\tZeta-Orbital\n"
+                    "\t  Si \t0\t    2\n"
+                    "\t  -0.20000000000000\n"
+                    "\t   0.40000000000000   0.60000000000000\n"
+                    "</Coefficient>\n")
+        C, C_read_index = sspsifc.read_C_init(self.fcoef, self.info_element, "identity")
+        self.assertSetEqual(C_read_index, {("Si", 0, 1)})
+        self.assertTrue(torch.equal(C["Si"][0].detach(),
+                                    torch.tensor([[1.0, -0.2], [0.0, 0.4], [0.0, 0.6]], dtype=torch.float64)))
+        self.assertTrue(torch.equal(C["Si"][1].detach(),
+                                    torch.tensor([[1.0], [0.0], [0.0]], dtype=torch.float64)))
+
+    def test_read_C_init_error(self):
+        with open(self.fcoef, "w") as f:
+            f.write(COEF[:COEF.index("</Coefficient>")])
+        with self.assertRaises(IOError):
+            sspsifc.read_C_init(self.fcoef, self.info_element)
+
+        with open(self.fcoef, "w") as f:
+            f.write(COEF.replace("\tType\tL\tZeta-Orbital\n\t  Si \t1", "\tTpye\tL\tZeta-Orbital\n\t  Si \t1"))
+        with self.assertRaises(IOError):
+            sspsifc.read_C_init(self.fcoef, self.info_element)
+
+if __name__ == "__main__":
+    unittest.main()
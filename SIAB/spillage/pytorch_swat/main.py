@@ -176,6 +176,8 @@ Max steps: {info_opt.max_steps}
         ###################################
         # initialize the loss_old to be infinity, so that the optimization will start
         loss_old = np.inf
+        # snapshot of C with the lowest loss, its buffers are reused by copy_C
+        C_old = None
         # arbitrarily set the max step to 30000 and if input defines it, use the input value
         maxSteps = 30000
         if isinstance(info_opt.max_steps, int):
@@ -247,7 +249,7 @@ Max steps: {info_opt.max_steps}
             flag_finish = 0
             if Loss.item() < loss_old:
                 loss_old = Loss.item()
-                C_old = sspsifc.copy_C(C, info_element)
+                C_old = sspsifc.copy_C(C, info_element, C_old)
                 flag_finish = 0
             else:
                 flag_finish += 1
@@ -390,7 +390,6 @@ def build_reduced(coeff, rcut, r, orthonormal=False):
 import unittest
 
 from numpy.linalg import norm
-import matplotlib.pyplot as plt
 
 class _TestRadial(unittest.TestCase):
 
@@ -577,6 +576,8 @@ class _TestRadial(unittest.TestCase):
 
 
     def est_plot_reduced(self):
+        import matplotlib.pyplot as plt
+
         lmax = 10
         nq = 7
 
@@ -5,6 +5,7 @@ from SIAB.spillage.jlzeros import JLZEROS
 
 import numpy as np
 from scipy.optimize import minimize, basinhopping
+from functools import lru_cache
 
 from copy import deepcopy
 
@@ -129,10 +130,12 @@ def _overlap_spillage(ovlp, coef, ibands, coef_frozen=None):
     return spill / len(ibands)
 
 
+@lru_cache(maxsize=None)
 def _nbes(l, rcut, ecut):
     '''
     Calculates the number of normalized truncated spherical Bessel functions
-    whose kinetic energy is below the energy cutoff.
+    whose kinetic energy is below the energy cutoff. Results are cached since
+    the same (l, rcut, ecut) is queried repeatedly.
 
     Note
     ----
@@ -169,13 +172,11 @@ def initgen(nzeta, ov, reduced=False):
     nbes = ov['nbes']
     rcut = ov['rcut']
     if reduced:
-        coef = [[jl_reduce(l, nbes, rcut).T.tolist() for l in range(ov['lmax'][0] + 1)]]
+        coef = [[jl_reduce(l, nbes, rcut).T for l in range(ov['lmax'][0] + 1)]]
         mo_jy = mo_jy @ _jy2ao(coef, ov['lin2comp'], nbes, rcut)
         nbes -= 1
     else: # normalized
-        uvec = lambda v, k, n: [v if i == k else 0 for i in range(n)]
-        coef = [[[uvec(1. / jl_raw_norm(l, q, rcut), q, nbes)
-                  for q in range(nbes)]
+        coef = [[np.diag([1. / jl_raw_norm(l, q, rcut) for q in range(nbes)])
                  for l in range(ov['lmax'][0] + 1)]]
         mo_jy = mo_jy @ _jy2ao(coef, ov['lin2comp'], nbes, rcut)
 
@@ -194,10 +195,10 @@ def initgen(nzeta, ov, reduced=False):
         val, vec = np.linalg.eigh(YdaggerY)
 
         # eigenvectors corresponding to the largest nzeta eigenvalues
-        coef.append(vec[:,-nzeta[l]:][:,::-1].T.tolist())
+        coef.append(vec[:,-nzeta[l]:][:,::-1].T)
         print(f"ORBGEN: Y*Y (jy_mo*mo_jy) eigval diagnosis:\n        l = {l}: {val[-nzeta[l]:][::-1]}", flush = True)
     #return coef
-    return [np.linalg.qr(np.array(coef_l).T)[0].T.tolist() for coef_l in coef]
+    return [np.linalg.qr(coef_l.T)[0].T.tolist() for coef_l in coef]
 
 
 class Spillage:
@@ -527,11 +528,6 @@ class Spillage:
 ############################################################
 import unittest
 
-from SIAB.spillage.radial import build_reduced, build_raw, coeff_reduced2raw
-from SIAB.spillage.plot import plot_chi
-
-import matplotlib.pyplot as plt
-
 
 class _TestSpillage(unittest.TestCase):
 
@@ -592,6 +588,11 @@ class _TestSpillage(unittest.TestCase):
 
         return
 
+        # plotting is only for manual inspection, skipped by the return above
+        from SIAB.spillage.radial import build_reduced, build_raw, coeff_reduced2raw
+        from SIAB.spillage.plot import plot_chi
+        import matplotlib.pyplot as plt
+
         rcut = ov['rcut']
         dr = 0.01
         r = np.linspace(0, rcut, int(rcut/dr)+1)
@@ -894,6 +895,11 @@ class _TestSpillage(unittest.TestCase):
 
         return
 
+        # plotting is only for manual inspection, skipped by the return above
+        from SIAB.spillage.radial import build_reduced, build_raw
+        from SIAB.spillage.plot import plot_chi
+        import matplotlib.pyplot as plt
+
         rcut = ov['rcut']
         dr = 0.01
         r = np.linspace(0, rcut, int(rcut/dr)+1)